@@ -1,13 +1,19 @@
 from fastapi import FastAPI, HTTPException, BackgroundTasks, UploadFile, File
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 import asyncio
+import json
+import shutil
 import tempfile
 import os
-from typing import List, Optional
+import zipfile
+from typing import BinaryIO, List, Optional, Tuple
 from pydantic import BaseModel
 from datetime import datetime
 from server.audio_processor import AudioProcessor, AudioConfig, AudioProcessingError
 from server.config import config  # Actualizado
+from server.services.inventory.ledger import InventoryLedger, InsufficientStockError, UnknownProductError
+from server.services.inventory.store import SQLiteStockStore
 
 app = FastAPI(title="Voice POS API")
 
@@ -42,6 +48,47 @@ class Sale(BaseModel):
 # Global audio processor instance
 audio_processor = AudioProcessor()
 
+# Example catalog; its stock seeds the inventory store on first run
+EXAMPLE_PRODUCTS = [
+    Product(
+        id=1,
+        name="Coca Cola 600ml",
+        price=2.50,
+        category="Beverages",
+        stock=100
+    ),
+    Product(
+        id=2,
+        name="Bread",
+        price=1.20,
+        category="Bakery",
+        stock=50
+    )
+]
+
+@app.on_event("startup")
+async def startup():
+    """Load stock into the inventory ledger and start write-behind flushing."""
+    app.state.config = config
+    store = SQLiteStockStore(config.INVENTORY_DB_PATH)
+    store.seed({product.id: product.stock for product in EXAMPLE_PRODUCTS})
+    app.state.inventory = InventoryLedger(
+        store,
+        config.INVENTORY_JOURNAL_PATH,
+        flush_interval=config.INVENTORY_FLUSH_INTERVAL,
+        flush_batch=config.INVENTORY_FLUSH_BATCH,
+        fsync=config.INVENTORY_JOURNAL_FSYNC
+    )
+    app.state.inventory.start()
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Flush pending stock changes to the inventory store."""
+    try:
+        app.state.inventory.stop()
+    finally:
+        app.state.inventory.store.close()
+
 @app.post("/audio/process")
 async def process_audio(audio_file: UploadFile = File(...)):
     """
@@ -74,7 +121,8 @@ async def process_audio(audio_file: UploadFile = File(...)):
             return {
                 "text": text,
                 "status": "success",
-                "filename": audio_file.filename
+                "filename": audio_file.filename,
+                "chunking": processor.speech_service.chunking_stats
             }
             
     except AudioProcessingError as e:
@@ -84,33 +132,205 @@ async def process_audio(audio_file: UploadFile = File(...)):
         if 'temp_audio' in locals():
             os.unlink(temp_audio.name)
 
+def _spool_audio(source: BinaryIO, filename: Optional[str]) -> str:
+    """Copy audio from a file object to a temporary file and return its path."""
+    suffix = os.path.splitext(filename or "")[1] or '.wav'
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as temp_audio:
+        shutil.copyfileobj(source, temp_audio)
+    return temp_audio.name
+
+def _is_archive_member_audio(name: str) -> bool:
+    """Skip directories and metadata entries added by archivers."""
+    return not (
+        name.endswith('/')
+        or name.startswith('__MACOSX/')
+        or os.path.basename(name).startswith('.')
+    )
+
+def _spool_archive_member(archive: zipfile.ZipFile, info: zipfile.ZipInfo, limit: int) -> Tuple[str, int]:
+    """Expand one archive member to a temporary file, refusing more than limit bytes."""
+    too_large = f"Archive member exceeds {limit} bytes"
+    if info.file_size > limit:
+        raise ValueError(too_large)
+    suffix = os.path.splitext(info.filename)[1] or '.wav'
+    size = 0
+    # The declared size can lie, so cap the bytes actually expanded as well
+    with archive.open(info) as member, \
+            tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as temp_audio:
+        try:
+            while block := member.read(1024 * 1024):
+                size += len(block)
+                if size > limit:
+                    raise ValueError(too_large)
+                temp_audio.write(block)
+        except BaseException:
+            temp_audio.close()
+            os.unlink(temp_audio.name)
+            raise
+    return temp_audio.name, size
+
+def _batch_failure(index: int, filename: Optional[str], member: Optional[str], error: Exception) -> dict:
+    """Build an NDJSON error line for /audio/process/batch."""
+    return {
+        "index": index,
+        "filename": filename,
+        "member": member,
+        "status": "error",
+        "error": str(error) or type(error).__name__
+    }
+
+def _spool_batch(files: List[UploadFile]) -> Tuple[list, list]:
+    """
+    Expand archives and write every batch file to disk.
+    
+    Runs in a worker thread: reading uploads, decompressing and writing temp
+    files would otherwise stall the event loop. Expansion stops once the
+    request reaches AUDIO_BATCH_MAX_MEMBERS or AUDIO_BATCH_MAX_TOTAL_BYTES,
+    and the remaining members are reported as failures.
+    
+    Returns:
+        tuple: Jobs as (index, filename, member, path) and failure lines
+    """
+    jobs = []
+    failures = []
+    members_left = config.AUDIO_BATCH_MAX_MEMBERS
+    bytes_left = config.AUDIO_BATCH_MAX_TOTAL_BYTES
+    
+    try:
+        for index, upload in enumerate(files):
+            upload.file.seek(0)
+            if not zipfile.is_zipfile(upload.file):
+                upload.file.seek(0)
+                jobs.append((index, upload.filename, None, _spool_audio(upload.file, upload.filename)))
+                continue
+            try:
+                archive = zipfile.ZipFile(upload.file)
+            except Exception as e:
+                failures.append(_batch_failure(index, upload.filename, None, e))
+                continue
+            with archive:
+                for info in archive.infolist():
+                    if not _is_archive_member_audio(info.filename):
+                        continue
+                    within_budget = members_left > 0 and bytes_left > 0 and (
+                        info.file_size <= bytes_left
+                        # Oversized members are rejected on their own below
+                        or info.file_size > config.AUDIO_BATCH_MAX_MEMBER_BYTES
+                    )
+                    if within_budget:
+                        try:
+                            path, size = _spool_archive_member(
+                                archive, info, config.AUDIO_BATCH_MAX_MEMBER_BYTES
+                            )
+                        except Exception as e:
+                            # Corrupt, encrypted, truncated or oversized members fail on their own
+                            failures.append(_batch_failure(index, upload.filename, info.filename, e))
+                            continue
+                        if size > bytes_left:
+                            os.unlink(path)
+                            within_budget = False
+                    if not within_budget:
+                        # Past the batch limit every remaining member fails
+                        members_left = bytes_left = 0
+                        limit_error = ValueError("Batch expansion limit reached")
+                        failures.append(_batch_failure(index, upload.filename, info.filename, limit_error))
+                        continue
+                    members_left -= 1
+                    bytes_left -= size
+                    jobs.append((index, upload.filename, info.filename, path))
+    except BaseException:
+        for *_, path in jobs:
+            os.unlink(path)
+        raise
+    
+    return jobs, failures
+
+@app.post("/audio/process/batch")
+async def process_audio_batch(
+    files: List[UploadFile] = File(...),
+    parallelism: Optional[int] = None
+):
+    """
+    Transcribe many audio files concurrently, one recognizer session per file.
+    
+    Zip archives are expanded and each audio member is processed as its own
+    file. Results stream back as NDJSON, one line per file in completion
+    order; a failed file produces an error line without stopping the batch.
+    
+    Every line has the same keys: "index" is the position of the upload in
+    the request, "filename" its name, "member" the archive member name (null
+    for plain files) and "status". Successful lines add "text" and
+    "chunking"; failed lines add "error".
+    
+    Args:
+        files: Uploaded audio files and/or zip archives of audio files
+        parallelism: Maximum files transcribed at once, capped by
+            AUDIO_BATCH_CONCURRENCY
+        
+    Returns:
+        StreamingResponse: NDJSON result lines
+    """
+    limit = config.AUDIO_BATCH_CONCURRENCY
+    if parallelism is not None:
+        if parallelism < 1:
+            raise HTTPException(status_code=422, detail="parallelism must be at least 1")
+        limit = min(parallelism, limit)
+    
+    # Spool everything to disk now; uploads are closed once this handler returns
+    jobs, failures = await asyncio.to_thread(_spool_batch, files)
+    
+    semaphore = asyncio.Semaphore(limit)
+    
+    async def transcribe(index: int, filename: Optional[str], member: Optional[str], path: str) -> dict:
+        async with semaphore:
+            try:
+                processor = AudioProcessor(AudioConfig(
+                    uri=app.state.config.VOSK_SERVER_URI,
+                    input_file=path
+                ))
+                text = await processor.process_audio_file()
+                return {
+                    "index": index,
+                    "filename": filename,
+                    "member": member,
+                    "status": "success",
+                    "text": text,
+                    "chunking": processor.speech_service.chunking_stats
+                }
+            except Exception as e:
+                return _batch_failure(index, filename, member, e)
+    
+    async def results():
+        tasks = [asyncio.create_task(transcribe(*job)) for job in jobs]
+        try:
+            for line in failures:
+                yield json.dumps(line) + "\n"
+            for next_result in asyncio.as_completed(tasks):
+                yield json.dumps(await next_result) + "\n"
+        finally:
+            # Client may disconnect mid-batch; stop outstanding work before cleanup
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            for *_, path in jobs:
+                os.unlink(path)
+    
+    return StreamingResponse(results(), media_type="application/x-ndjson")
+
 @app.get("/products", response_model=List[Product])
 async def get_products():
     """
-    Return list of available products.
+    Return list of available products with their current stock.
     """
-    # TODO: Implement database logic
-    # For now, return example data
-    products = [
-        Product(
-            id=1,
-            name="Coca Cola 600ml",
-            price=2.50,
-            category="Beverages",
-            stock=100
-        ),
-        Product(
-            id=2,
-            name="Bread",
-            price=1.20,
-            category="Bakery",
-            stock=50
-        )
+    # TODO: Implement database logic for the catalog
+    stock = app.state.inventory.snapshot()
+    return [
+        product.copy(update={"stock": stock.get(product.id, product.stock)})
+        for product in EXAMPLE_PRODUCTS
     ]
-    return products
 
 @app.post("/sales", response_model=Sale)
-async def create_sale(sale: Sale):
+def create_sale(sale: Sale):
     """
     Create a new sale with the specified items.
     
@@ -119,11 +339,27 @@ async def create_sale(sale: Sale):
     
     Returns:
         Created sale object
+    
+    Raises:
+        HTTPException: 404 for unknown products, 409 if stock is insufficient
     """
+    # Plain def on purpose: the ledger blocks on locks and journal I/O, so
+    # FastAPI runs this in its threadpool instead of on the event loop
+    quantities = {}
+    for item in sale.items:
+        quantities[item.product_id] = quantities.get(item.product_id, 0) + item.quantity
+    
     try:
+        app.state.inventory.decrement(quantities)
         # TODO: Implement database logic
         # For now, just return the received sale
         return sale
+    except UnknownProductError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except InsufficientStockError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -27,6 +27,8 @@ class AudioConfig:
     device: Optional[int] = None
     samplerate: int = config.AUDIO_SAMPLERATE
     blocksize: int = config.AUDIO_BLOCKSIZE
+    min_blocksize: int = config.AUDIO_BLOCKSIZE_MIN
+    max_blocksize: int = config.AUDIO_BLOCKSIZE_MAX
     channels: int = config.AUDIO_CHANNELS
     timeout: int = config.AUDIO_TIMEOUT
     language: str = config.AUDIO_LANGUAGE
@@ -54,7 +56,15 @@ class AudioProcessor:
         self.text_buffer: List[str] = []
         self.last_text_time: float = time.time()
         self.logger = logging.getLogger(__name__)
-        self.speech_service: SpeechRecognitionService = VoskService()
+        self.speech_service: SpeechRecognitionService = VoskService(
+            uri=self.config.uri,
+            language=self.config.language,
+            blocksize=self.config.blocksize,
+            min_blocksize=self.config.min_blocksize,
+            max_blocksize=self.config.max_blocksize,
+            channels=self.config.channels,
+            samplerate=self.config.samplerate
+        )
 
     def callback(self, indata: np.ndarray, frames: int, time_info: Dict, status: Any) -> None:
         """
@@ -113,10 +123,11 @@ class AudioProcessor:
             await self.speech_service.initialize()
             print("Audio processing started. Speak into the microphone...")
             
-            # Set up audio stream
+            # Capture at the smallest chunk size; the speech service coalesces
+            # blocks into whatever size its chunker currently wants to send
             stream = sd.RawInputStream(
                 samplerate=self.config.samplerate,
-                blocksize=self.config.blocksize,
+                blocksize=self.config.min_blocksize,
                 device=self.config.device,
                 dtype='int16',
                 channels=self.config.channels,
@@ -160,6 +171,7 @@ class AudioProcessor:
                     print(f"No voice activity for {self.config.timeout} seconds, stopping...")
                     break
             
+            self.logger.info("Chunking stats: %s", self.speech_service.chunking_stats)
             return " ".join(self.text_buffer)
             
         finally:
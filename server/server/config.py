@@ -29,9 +29,20 @@ class Config:
     VOSK_SERVER_URI: str = get_env_var("VOSK_SERVER_URI", "ws://localhost:2700")
     AUDIO_SAMPLERATE: int = get_env_var("AUDIO_SAMPLERATE", 16000)
     AUDIO_BLOCKSIZE: int = get_env_var("AUDIO_BLOCKSIZE", 4000)
+    AUDIO_BLOCKSIZE_MIN: int = get_env_var("AUDIO_BLOCKSIZE_MIN", 800)
+    AUDIO_BLOCKSIZE_MAX: int = get_env_var("AUDIO_BLOCKSIZE_MAX", 32000)
     AUDIO_CHANNELS: int = get_env_var("AUDIO_CHANNELS", 1)
     AUDIO_TIMEOUT: int = get_env_var("AUDIO_TIMEOUT", 30)
     AUDIO_LANGUAGE: str = get_env_var("AUDIO_LANGUAGE", "es")
+    AUDIO_BATCH_CONCURRENCY: int = get_env_var("AUDIO_BATCH_CONCURRENCY", 4)
+    AUDIO_BATCH_MAX_MEMBER_BYTES: int = get_env_var("AUDIO_BATCH_MAX_MEMBER_BYTES", 50 * 1024 * 1024)
+    AUDIO_BATCH_MAX_MEMBERS: int = get_env_var("AUDIO_BATCH_MAX_MEMBERS", 200)
+    AUDIO_BATCH_MAX_TOTAL_BYTES: int = get_env_var("AUDIO_BATCH_MAX_TOTAL_BYTES", 512 * 1024 * 1024)
+    INVENTORY_DB_PATH: str = get_env_var("INVENTORY_DB_PATH", "inventory.db")
+    INVENTORY_JOURNAL_PATH: str = get_env_var("INVENTORY_JOURNAL_PATH", "inventory.journal")
+    INVENTORY_FLUSH_INTERVAL: float = get_env_var("INVENTORY_FLUSH_INTERVAL", 1.0)
+    INVENTORY_FLUSH_BATCH: int = get_env_var("INVENTORY_FLUSH_BATCH", 500)
+    INVENTORY_JOURNAL_FSYNC: bool = get_env_var("INVENTORY_JOURNAL_FSYNC", False)
     LOG_LEVEL: str = get_env_var("LOG_LEVEL", "INFO")
     LOG_FORMAT: str = get_env_var(
         "LOG_FORMAT", 
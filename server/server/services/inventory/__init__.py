@@ -0,0 +1 @@
+# Este archivo puede estar vacío
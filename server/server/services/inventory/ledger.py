@@ -0,0 +1,336 @@
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Mapping, Optional
+
+from server.services.inventory.store import StockStore
+
+logger = logging.getLogger(__name__)
+
+
+class InventoryError(Exception):
+    """Base exception for inventory errors."""
+    pass
+
+
+class UnknownProductError(InventoryError):
+    """Raised when a stock change references a product the ledger does not track."""
+
+    def __init__(self, product_id: int):
+        self.product_id = product_id
+        super().__init__(f"Unknown product: {product_id}")
+
+
+class InsufficientStockError(InventoryError):
+    """Raised when a decrement would take a product's stock below zero."""
+
+    def __init__(self, product_id: int, requested: int, available: int):
+        self.product_id = product_id
+        self.requested = requested
+        self.available = available
+        super().__init__(
+            f"Insufficient stock for product {product_id}: "
+            f"requested {requested}, available {available}"
+        )
+
+
+class InventoryLedger:
+    """
+    In-memory stock ledger with a write-ahead journal and write-behind flushing.
+
+    Every accepted change is appended to the journal before it is applied in
+    memory, so stock checks never wait on the database. A background thread
+    flushes the accumulated deltas to the store in one transaction together
+    with the last journal sequence it covers; on start, journal entries past
+    that sequence are replayed.
+
+    Attributes:
+        store (StockStore): Durable storage the ledger flushes to
+        journal_path (str): Append-only journal file
+        flush_interval (float): Seconds between background flushes
+        flush_batch (int): Pending journal entries that trigger an early flush
+        fsync (bool): Whether to fsync the journal after every entry
+    """
+
+    def __init__(
+        self,
+        store: StockStore,
+        journal_path: str,
+        flush_interval: float = 1.0,
+        flush_batch: int = 500,
+        fsync: bool = False,
+    ):
+        self.store = store
+        self.journal_path = journal_path
+        self.flushing_path = journal_path + ".flushing"
+        self.flush_interval = flush_interval
+        self.flush_batch = flush_batch
+        self.fsync = fsync
+
+        self._stock: Dict[int, int] = {}
+        self._locks: Dict[int, threading.Lock] = {}
+        self._journal = None
+        self._journal_broken = False
+        self._journal_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._seq = 0
+        self._pending: Dict[int, int] = {}
+        self._pending_entries = 0
+        self._flushed_seq = 0
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+
+        self.accepted = 0
+        self.rejected = 0
+        self.flushes = 0
+        self.replayed = 0
+        self.last_flush_time: Optional[float] = None
+
+    def start(self) -> None:
+        """Load stock, replay the journal and start the background flusher."""
+        self._recover()
+        self._journal = self._open_journal()
+        self._stopped.clear()
+        self._flusher = threading.Thread(
+            target=self._flush_loop, name="inventory-flusher", daemon=True
+        )
+        self._flusher.start()
+        logger.info("Inventory ledger started with %d products", len(self._stock))
+
+    def stop(self) -> None:
+        """Stop the flusher and write any pending changes to the store."""
+        self._stopped.set()
+        self._wake.set()
+        if self._flusher:
+            self._flusher.join()
+            self._flusher = None
+        try:
+            self.flush()
+        finally:
+            if self._journal:
+                self._journal.close()
+                self._journal = None
+
+    def get_stock(self, product_id: int) -> int:
+        """Return the current stock for a product."""
+        if product_id not in self._stock:
+            raise UnknownProductError(product_id)
+        return self._stock[product_id]
+
+    def snapshot(self) -> Dict[int, int]:
+        """Return the current stock of every product."""
+        return dict(self._stock)
+
+    def decrement(self, items: Mapping[int, int]) -> int:
+        """
+        Atomically take stock for every item, or for none of them.
+
+        Args:
+            items: Quantity to take per product id
+
+        Returns:
+            int: Journal sequence number of the change
+
+        Raises:
+            UnknownProductError: If a product is not tracked
+            InsufficientStockError: If any product lacks the requested quantity
+        """
+        return self._apply({product_id: -self._quantity(q) for product_id, q in items.items()})
+
+    def restock(self, items: Mapping[int, int]) -> int:
+        """Atomically add stock for every item. Returns the journal sequence number."""
+        return self._apply({product_id: self._quantity(q) for product_id, q in items.items()})
+
+    @staticmethod
+    def _quantity(quantity: int) -> int:
+        if quantity <= 0:
+            raise ValueError(f"Quantity must be positive, got {quantity}")
+        return quantity
+
+    def _apply(self, deltas: Dict[int, int]) -> int:
+        product_ids = sorted(deltas)
+        for product_id in product_ids:
+            if product_id not in self._locks:
+                raise UnknownProductError(product_id)
+
+        # Always lock in product id order so concurrent multi-item sales cannot deadlock
+        locks = [self._locks[product_id] for product_id in product_ids]
+        for lock in locks:
+            lock.acquire()
+        try:
+            for product_id in product_ids:
+                available = self._stock[product_id]
+                if available + deltas[product_id] < 0:
+                    with self._journal_lock:
+                        self.rejected += 1
+                    raise InsufficientStockError(product_id, -deltas[product_id], available)
+
+            seq = self._append(deltas)
+            for product_id in product_ids:
+                self._stock[product_id] += deltas[product_id]
+            return seq
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+
+    def _open_journal(self):
+        # Unbuffered, so a failed write leaves nothing queued to land later
+        return open(self.journal_path, "ab", buffering=0)
+
+    def _append(self, deltas: Dict[int, int]) -> int:
+        with self._journal_lock:
+            if self._journal_broken:
+                raise InventoryError("Journal is unwritable after a failed write; restart to recover")
+            seq = self._seq + 1
+            entry = {"seq": seq, "deltas": deltas, "time": time.time()}
+            self._write_entry((json.dumps(entry) + "\n").encode("utf-8"))
+            self._seq = seq
+            for product_id, delta in deltas.items():
+                self._pending[product_id] = self._pending.get(product_id, 0) + delta
+            self._pending_entries += 1
+            self.accepted += 1
+            if self._pending_entries >= self.flush_batch:
+                self._wake.set()
+        return seq
+
+    def _write_entry(self, line: bytes) -> None:
+        """Append one journal line, or leave the journal exactly as it was."""
+        offset = os.fstat(self._journal.fileno()).st_size
+        try:
+            view = memoryview(line)
+            while view:
+                view = view[self._journal.write(view):]
+            if self.fsync:
+                os.fsync(self._journal.fileno())
+        except OSError:
+            # Cut off the partial line so later entries never follow garbage
+            try:
+                self._journal.truncate(offset)
+            except OSError:
+                logger.error("Could not truncate journal after a failed write; refusing new entries")
+                self._journal_broken = True
+            raise
+
+    def flush(self) -> int:
+        """
+        Write pending deltas to the store in a single batch.
+
+        Returns:
+            int: Number of products written
+        """
+        with self._flush_lock:
+            with self._journal_lock:
+                if not self._pending:
+                    return 0
+                deltas, self._pending = self._pending, {}
+                entries, self._pending_entries = self._pending_entries, 0
+                seq = self._seq
+                self._rotate_journal()
+
+            try:
+                self.store.apply(deltas, seq)
+            except Exception:
+                # Keep the deltas pending; the rotated journal still covers them
+                with self._journal_lock:
+                    for product_id, delta in deltas.items():
+                        self._pending[product_id] = self._pending.get(product_id, 0) + delta
+                    self._pending_entries += entries
+                raise
+
+            os.remove(self.flushing_path)
+            self._flushed_seq = seq
+            self.flushes += 1
+            self.last_flush_time = time.time()
+            logger.debug("Flushed %d products up to journal sequence %d", len(deltas), seq)
+            return len(deltas)
+
+    def _rotate_journal(self) -> None:
+        """Move the live journal aside so it can be dropped once the store commits."""
+        self._journal.close()
+        if os.path.exists(self.flushing_path):
+            # A previous flush failed; its entries are still uncommitted. Merge
+            # under a temp name so a crash never leaves a half-written file.
+            merged_path = self.flushing_path + ".tmp"
+            with open(merged_path, "w", encoding="utf-8") as dst:
+                for path in (self.flushing_path, self.journal_path):
+                    with open(path, "r", encoding="utf-8") as src:
+                        dst.write(src.read())
+            os.replace(merged_path, self.flushing_path)
+            os.remove(self.journal_path)
+        else:
+            os.replace(self.journal_path, self.flushing_path)
+        self._journal = self._open_journal()
+
+    def _flush_loop(self) -> None:
+        while not self._stopped.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            if self._stopped.is_set():
+                break  # stop() does the final flush
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Error flushing inventory ledger: {e}")
+
+    def _recover(self) -> None:
+        stock, checkpoint = self.store.load()
+        self._seq = self._flushed_seq = checkpoint
+        replay: Dict[int, int] = {}
+
+        lines = []
+        for path in (self.flushing_path, self.journal_path):
+            if os.path.exists(path):
+                with open(path, "r", encoding="utf-8") as journal:
+                    lines.extend((path, number, line) for number, line in enumerate(journal, 1))
+
+        for position, (path, number, line) in enumerate(lines):
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                if position != len(lines) - 1:
+                    # Entries after this one were acknowledged; keep the journal for inspection
+                    raise InventoryError(f"Corrupt journal entry at {path}:{number}")
+                # Torn write from a crash; nothing after it was acknowledged
+                logger.warning("Ignoring truncated journal entry at %s:%d", path, number)
+                break
+            # Skips flushed entries, and entries present in both files
+            # when a crash interrupted a journal merge
+            if entry["seq"] <= self._seq:
+                continue
+            for product_id, delta in entry["deltas"].items():
+                replay[int(product_id)] = replay.get(int(product_id), 0) + delta
+            self._seq = entry["seq"]
+            self.replayed += 1
+
+        if replay:
+            # Checkpoint the replayed state right away so the journals can start empty
+            self.store.apply(replay, self._seq)
+            self._flushed_seq = self._seq
+            for product_id, delta in replay.items():
+                stock[product_id] = stock.get(product_id, 0) + delta
+            logger.info("Replayed %d journal entries", self.replayed)
+
+        for path in (self.flushing_path, self.journal_path, self.flushing_path + ".tmp"):
+            if os.path.exists(path):
+                os.remove(path)
+
+        self._stock = stock
+        self._locks = {product_id: threading.Lock() for product_id in stock}
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Summary of ledger activity and write-behind progress."""
+        return {
+            "products": len(self._stock),
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "journal_seq": self._seq,
+            "flushed_seq": self._flushed_seq,
+            "pending_entries": self._pending_entries,
+            "flushes": self.flushes,
+            "replayed": self.replayed,
+            "last_flush_time": self.last_flush_time,
+        }
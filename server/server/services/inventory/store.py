@@ -0,0 +1,72 @@
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, Mapping, Tuple
+
+
+class StockStore(ABC):
+    """Abstract base class for durable stock storage behind the ledger."""
+
+    @abstractmethod
+    def load(self) -> Tuple[Dict[int, int], int]:
+        """Return stock per product id and the last journal sequence applied."""
+        pass
+
+    @abstractmethod
+    def apply(self, deltas: Mapping[int, int], seq: int) -> None:
+        """Atomically add stock deltas and record the journal sequence."""
+        pass
+
+    @abstractmethod
+    def close(self) -> None:
+        """Clean up resources."""
+        pass
+
+
+class SQLiteStockStore(StockStore):
+    """SQLite implementation of stock storage."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS stock (
+                product_id INTEGER PRIMARY KEY,
+                quantity INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS ledger_checkpoint (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                seq INTEGER NOT NULL
+            );
+            INSERT OR IGNORE INTO ledger_checkpoint (id, seq) VALUES (1, 0);
+        """)
+        self._conn.commit()
+
+    def seed(self, stock: Mapping[int, int]) -> None:
+        """Insert initial stock for products that are not stored yet."""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO stock (product_id, quantity) VALUES (?, ?)",
+                stock.items()
+            )
+
+    def load(self) -> Tuple[Dict[int, int], int]:
+        with self._lock:
+            stock = dict(self._conn.execute("SELECT product_id, quantity FROM stock"))
+            (seq,) = self._conn.execute(
+                "SELECT seq FROM ledger_checkpoint WHERE id = 1"
+            ).fetchone()
+        return stock, seq
+
+    def apply(self, deltas: Mapping[int, int], seq: int) -> None:
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE stock SET quantity = quantity + ? WHERE product_id = ?",
+                [(delta, product_id) for product_id, delta in deltas.items()]
+            )
+            self._conn.execute("UPDATE ledger_checkpoint SET seq = ? WHERE id = 1", (seq,))
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -19,6 +19,11 @@ class SpeechRecognitionService(ABC):
         """Process audio from a file."""
         pass
     
+    @property
+    def chunking_stats(self) -> Optional[dict]:
+        """Chunk sizing stats for the most recent stream or file, if tracked."""
+        return None
+    
     @abstractmethod
     async def shutdown(self) -> None:
         """Clean up resources."""
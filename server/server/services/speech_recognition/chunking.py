@@ -0,0 +1,184 @@
+import logging
+from collections import deque
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Deque, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ChunkingMode(str, Enum):
+    INTERACTIVE = "interactive"  # Microphone streams: keep partials flowing
+    FILE = "file"  # Uploaded files: push audio through as fast as possible
+
+
+@dataclass
+class ChunkPolicy:
+    """
+    Bounds and tuning knobs for adaptive chunk sizing.
+
+    Attributes:
+        mode: Whether the policy optimizes for latency or throughput
+        min_size: Smallest chunk to send, in frames
+        max_size: Largest chunk to send, in frames
+        initial_size: Chunk size used before any measurement, in frames
+        samplerate: Sample rate used to convert frames to seconds
+        target_load: Interactive only. Desired ratio of round-trip time to
+            chunk duration; above 1.0 the stream falls behind real time
+        min_response_rate: Interactive only. Fraction of chunks that must
+            produce a partial before shrinking chunks is worth it
+        grow_factor: Multiplier applied when increasing the chunk size
+        shrink_factor: Multiplier applied when decreasing the chunk size
+        smoothing: Weight of the newest sample in the moving averages
+        history: Number of recent decisions kept for stats
+    """
+    mode: ChunkingMode
+    min_size: int
+    max_size: int
+    initial_size: int
+    samplerate: int = 16000
+    target_load: float = 0.5
+    min_response_rate: float = 0.3
+    grow_factor: float = 1.5
+    shrink_factor: float = 0.75
+    smoothing: float = 0.3
+    history: int = 20
+
+    def __post_init__(self):
+        if self.min_size <= 0 or self.max_size < self.min_size:
+            raise ValueError(
+                f"Invalid chunk bounds: min={self.min_size}, max={self.max_size}"
+            )
+        self.initial_size = max(self.min_size, min(self.initial_size, self.max_size))
+
+    @classmethod
+    def interactive(cls, min_size: int, max_size: int, initial_size: int,
+                    samplerate: int = 16000) -> "ChunkPolicy":
+        """Latency-first policy for live microphone streams."""
+        return cls(ChunkingMode.INTERACTIVE, min_size, max_size, initial_size, samplerate)
+
+    @classmethod
+    def file_upload(cls, min_size: int, max_size: int, initial_size: int,
+                    samplerate: int = 16000) -> "ChunkPolicy":
+        """Throughput-first policy for uploaded audio files."""
+        return cls(ChunkingMode.FILE, min_size, max_size, initial_size, samplerate,
+                   grow_factor=2.0, shrink_factor=0.5)
+
+
+class AdaptiveChunker:
+    """
+    Tune the number of frames sent per recognizer round trip.
+
+    Interactive streams keep the round-trip time at a fraction of the audio
+    duration of each chunk: chunks grow when the link cannot keep up with
+    real time and shrink while there is headroom and the recognizer is
+    actually returning partials. File uploads hill-climb on frames per
+    second, growing unless throughput clearly drops, and shrinking only for
+    as long as that measurably helps.
+    """
+
+    def __init__(self, policy: ChunkPolicy):
+        self.policy = policy
+        self.size = policy.initial_size
+        self.chunks = 0
+        self.frames = 0
+        self.total_rtt = 0.0
+        self.avg_rtt: Optional[float] = None
+        self.response_rate: Optional[float] = None
+        self.throughput: Optional[float] = None
+        self.adjustments = 0
+        self.decisions: Deque[Dict[str, Any]] = deque(maxlen=policy.history)
+        self._direction = 1
+        self._last_throughput: Optional[float] = None
+
+    def next_size(self) -> int:
+        """Return the number of frames to send in the next chunk."""
+        return self.size
+
+    def record(self, frames: int, rtt: float, responded: bool) -> int:
+        """
+        Record one round trip and return the size for the next chunk.
+
+        Args:
+            frames: Number of frames that were sent
+            rtt: Seconds between sending the chunk and receiving the reply
+            responded: Whether the recognizer returned a partial or text
+        """
+        if frames <= 0:
+            return self.size
+
+        self.chunks += 1
+        self.frames += frames
+        self.total_rtt += rtt
+        self.avg_rtt = self._smooth(self.avg_rtt, rtt)
+        self.response_rate = self._smooth(self.response_rate, 1.0 if responded else 0.0)
+        self.throughput = self._smooth(self.throughput, frames / max(rtt, 1e-6))
+
+        if self.policy.mode == ChunkingMode.INTERACTIVE:
+            new_size, reason = self._interactive_size(frames)
+        else:
+            new_size, reason = self._file_size()
+
+        new_size = max(self.policy.min_size, min(int(new_size), self.policy.max_size))
+        if new_size != self.size:
+            self.adjustments += 1
+            self.decisions.append({
+                "chunk": self.chunks,
+                "from": self.size,
+                "to": new_size,
+                "reason": reason,
+                "avg_rtt_ms": round(self.avg_rtt * 1000, 2),
+                "response_rate": round(self.response_rate, 3),
+            })
+            logger.debug("Chunk size %d -> %d (%s)", self.size, new_size, reason)
+            self.size = new_size
+        return self.size
+
+    def _smooth(self, current: Optional[float], sample: float) -> float:
+        if current is None:
+            return sample
+        return current + self.policy.smoothing * (sample - current)
+
+    def _interactive_size(self, frames: int):
+        duration = frames / self.policy.samplerate
+        load = self.avg_rtt / duration
+        if load > self.policy.target_load:
+            return self.size * self.policy.grow_factor, f"load {load:.2f} above target"
+        if load < self.policy.target_load / 2 and self.response_rate >= self.policy.min_response_rate:
+            return self.size * self.policy.shrink_factor, f"load {load:.2f} leaves headroom"
+        return self.size, ""
+
+    def _file_size(self):
+        previous = self._last_throughput
+        self._last_throughput = self.throughput
+        if previous is None:
+            return self.size * self.policy.grow_factor, "probing throughput"
+        if self._direction > 0:
+            # Flat or noisy results keep growing; only a clear drop earns a step back
+            if self.throughput < previous * 0.95:
+                self._direction = -1
+                return self.size * self.policy.shrink_factor, "throughput dropped"
+            return self.size * self.policy.grow_factor, "throughput holding"
+        # Keep shrinking only while it measurably pays off
+        if self.throughput > previous * 1.05:
+            return self.size * self.policy.shrink_factor, "throughput rising"
+        self._direction = 1
+        return self.size * self.policy.grow_factor, "shrinking did not help"
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Summary of measurements and sizing decisions."""
+        return {
+            "mode": self.policy.mode.value,
+            "min_size": self.policy.min_size,
+            "max_size": self.policy.max_size,
+            "current_size": self.size,
+            "chunks": self.chunks,
+            "frames": self.frames,
+            "avg_rtt_ms": round(self.avg_rtt * 1000, 2) if self.avg_rtt is not None else None,
+            "mean_rtt_ms": round(self.total_rtt / self.chunks * 1000, 2) if self.chunks else None,
+            "response_rate": round(self.response_rate, 3) if self.response_rate is not None else None,
+            "throughput_fps": round(self.throughput, 1) if self.throughput is not None else None,
+            "adjustments": self.adjustments,
+            "decisions": list(self.decisions),
+        }
@@ -3,16 +3,37 @@ import asyncio
 from typing import Optional, AsyncGenerator
 import websockets
 from server.services.speech_recognition.base import SpeechRecognitionService
+from server.services.speech_recognition.chunking import AdaptiveChunker, ChunkPolicy
 from server.config import config
 import time
 
 class VoskService(SpeechRecognitionService):
     """VOSK implementation of speech recognition service."""
     
-    def __init__(self, uri: str = config.VOSK_SERVER_URI, language: str = config.AUDIO_LANGUAGE):
+    def __init__(
+        self,
+        uri: str = config.VOSK_SERVER_URI,
+        language: str = config.AUDIO_LANGUAGE,
+        blocksize: int = config.AUDIO_BLOCKSIZE,
+        min_blocksize: int = config.AUDIO_BLOCKSIZE_MIN,
+        max_blocksize: int = config.AUDIO_BLOCKSIZE_MAX,
+        channels: int = config.AUDIO_CHANNELS,
+        samplerate: int = config.AUDIO_SAMPLERATE,
+    ):
         self.uri = uri
         self.language = language
+        self.blocksize = blocksize
+        self.min_blocksize = min_blocksize
+        self.max_blocksize = max_blocksize
+        self.channels = channels
+        self.samplerate = samplerate
         self.websocket = None
+        self.chunker: Optional[AdaptiveChunker] = None
+
+    @property
+    def chunking_stats(self) -> Optional[dict]:
+        """Chunk sizing stats for the most recent stream or file."""
+        return self.chunker.stats if self.chunker else None
     
     async def initialize(self) -> None:
         """Initialize connection to VOSK server."""
@@ -21,7 +42,7 @@ class VoskService(SpeechRecognitionService):
             self.websocket = await websockets.connect(self.uri)
             config_msg = {
                 "config": {
-                    "sample_rate": config.AUDIO_SAMPLERATE,
+                    "sample_rate": self.samplerate,
                     "lang": self.language
                 }
             }
@@ -36,25 +57,21 @@ class VoskService(SpeechRecognitionService):
         """Process streaming audio data using VOSK."""
         try:
             print("Starting audio stream processing...")
-            async for chunk in audio_stream:
-                await self.websocket.send(chunk)
-                response = await self.websocket.recv()
-                response_data = json.loads(response)
-                
-                # Yield tanto el texto como un indicador de actividad de voz
-                has_voice_activity = False
-                text = ""
-                
-                if "text" in response_data and response_data["text"].strip():
-                    text = response_data["text"].strip()
-                    has_voice_activity = True
-                elif "partial" in response_data and response_data["partial"].strip():
-                    has_voice_activity = True
-                
-                yield {
-                    "text": text,
-                    "has_voice_activity": has_voice_activity
-                }
+            self.chunker = AdaptiveChunker(ChunkPolicy.interactive(
+                self.min_blocksize, self.max_blocksize, self.blocksize, self.samplerate
+            ))
+            frame_bytes = 2 * self.channels  # int16 samples
+            buffer = b""
+            async for data in audio_stream:
+                buffer += data
+                chunk_bytes = self.chunker.next_size() * frame_bytes
+                if len(buffer) < chunk_bytes:
+                    continue
+                chunk, buffer = buffer[:chunk_bytes], buffer[chunk_bytes:]
+                yield await self._send_stream_chunk(chunk, len(chunk) // frame_bytes)
+
+            if buffer:
+                yield await self._send_stream_chunk(buffer, len(buffer) // frame_bytes)
                     
             print("Audio stream ended, sending EOF")
             await self.websocket.send('{"eof" : 1}')
@@ -70,22 +87,58 @@ class VoskService(SpeechRecognitionService):
             print(f"Error in audio stream processing: {e}")
             raise RuntimeError(f"Error processing audio stream: {e}")
     
+    async def _send_stream_chunk(self, chunk: bytes, frames: int) -> dict:
+        """Send one stream chunk and report its round trip to the chunker."""
+        started = time.perf_counter()
+        await self.websocket.send(chunk)
+        response = await self.websocket.recv()
+        rtt = time.perf_counter() - started
+        response_data = json.loads(response)
+        
+        # Yield tanto el texto como un indicador de actividad de voz
+        has_voice_activity = False
+        text = ""
+        
+        if "text" in response_data and response_data["text"].strip():
+            text = response_data["text"].strip()
+            has_voice_activity = True
+        elif "partial" in response_data and response_data["partial"].strip():
+            has_voice_activity = True
+        
+        self.chunker.record(frames, rtt, has_voice_activity)
+        return {
+            "text": text,
+            "has_voice_activity": has_voice_activity
+        }
+    
     async def process_audio_file(self, file_path: str) -> str:
         """Process audio file using VOSK."""
         import soundfile as sf
         
         try:
-            audio_data, sample_rate = sf.read(file_path)
+            # Decode off the event loop so concurrent files don't block each other
+            audio_data, sample_rate = await asyncio.to_thread(sf.read, file_path)
             texts = []
             
-            chunk_size = config.AUDIO_BLOCKSIZE
-            for i in range(0, len(audio_data), chunk_size):
-                chunk = audio_data[i:i + chunk_size]
+            self.chunker = AdaptiveChunker(ChunkPolicy.file_upload(
+                self.min_blocksize, self.max_blocksize, self.blocksize, sample_rate
+            ))
+            i = 0
+            while i < len(audio_data):
+                chunk = audio_data[i:i + self.chunker.next_size()]
+                i += len(chunk)
+                started = time.perf_counter()
                 await self.websocket.send(bytes(chunk))
                 response = await self.websocket.recv()
+                rtt = time.perf_counter() - started
                 response_data = json.loads(response)
+                responded = False
                 if "text" in response_data and response_data["text"].strip():
                     texts.append(response_data["text"])
+                    responded = True
+                elif "partial" in response_data and response_data["partial"].strip():
+                    responded = True
+                self.chunker.record(len(chunk), rtt, responded)
             
             return " ".join(texts)
             
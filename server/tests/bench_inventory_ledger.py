@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Measure sale throughput of the inventory ledger with concurrent tills.
+
+Run from the server directory: python -m tests.bench_inventory_ledger
+"""
+
+import argparse
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from server.services.inventory.ledger import InsufficientStockError, InventoryLedger
+from server.services.inventory.store import SQLiteStockStore
+
+
+def run(tills: int, sales: int, products: int, fsync: bool) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SQLiteStockStore(str(Path(tmp) / "inventory.db"))
+        store.seed({product_id: tills * sales for product_id in range(products)})
+        ledger = InventoryLedger(store, str(Path(tmp) / "inventory.journal"), fsync=fsync)
+        ledger.start()
+
+        def till(offset: int):
+            for i in range(sales):
+                product_id = (offset + i) % products
+                try:
+                    ledger.decrement({product_id: 1, (product_id + 1) % products: 1})
+                except InsufficientStockError:
+                    pass
+
+        threads = [threading.Thread(target=till, args=(n,)) for n in range(tills)]
+        started = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - started
+        ledger.stop()
+        store.close()
+
+        total = tills * sales
+        print(f"{tills} tills x {sales} sales over {products} products (fsync={fsync})")
+        print(f"  {total / elapsed:,.0f} sales/s, {elapsed * 1e6 / total:.1f} us/sale")
+        print(f"  stats: {ledger.stats}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Inventory ledger benchmark")
+    parser.add_argument('-t', '--tills', type=int, default=8)
+    parser.add_argument('-s', '--sales', type=int, default=5000)
+    parser.add_argument('-p', '--products', type=int, default=100)
+    parser.add_argument('--fsync', action='store_true', help='fsync the journal on every sale')
+    args = parser.parse_args()
+    run(args.tills, args.sales, args.products, args.fsync)
@@ -0,0 +1,163 @@
+import asyncio
+import io
+import json
+import os
+import zipfile
+
+import pytest
+from fastapi.testclient import TestClient
+
+from server.app import app
+from server.audio_processor import AudioProcessingError, AudioProcessor
+from server.config import config
+from server.services.inventory.ledger import InventoryLedger
+from server.services.inventory.store import SQLiteStockStore
+
+
+@pytest.fixture
+def client(tmp_path):
+    store = SQLiteStockStore(str(tmp_path / "inventory.db"))
+    store.seed({1: 2})
+    ledger = InventoryLedger(store, str(tmp_path / "inventory.journal"))
+    ledger.start()
+    # Not used as a context manager, so the startup handler does not run
+    app.state.inventory = ledger
+    app.state.config = config
+    yield TestClient(app)
+    ledger.stop()
+    store.close()
+
+
+def sale(product_id, quantity):
+    return {
+        "items": [{"product_id": product_id, "quantity": quantity, "unit_price": 2.50}],
+        "total": 2.50 * quantity
+    }
+
+
+def test_create_sale_rejects_oversell_and_unknown_product(client):
+    assert client.post("/sales", json=sale(1, 3)).status_code == 409
+    assert client.post("/sales", json=sale(99, 1)).status_code == 404
+    assert client.post("/sales", json=sale(1, 2)).status_code == 200
+    assert app.state.inventory.get_stock(1) == 0
+
+
+@pytest.fixture
+def transcriptions(monkeypatch):
+    """Stub recognizer: each file's content says how long to take or to fail."""
+    state = {"running": 0, "peak": 0, "paths": []}
+
+    async def fake_process_audio_file(self):
+        state["paths"].append(self.config.input_file)
+        with open(self.config.input_file, "rb") as f:
+            command, _, arg = f.read().decode().partition(":")
+        state["running"] += 1
+        state["peak"] = max(state["peak"], state["running"])
+        try:
+            await asyncio.sleep(float(arg or 0))
+            if command == "fail":
+                raise AudioProcessingError("recognizer unavailable")
+            return f"{command} done"
+        finally:
+            state["running"] -= 1
+
+    monkeypatch.setattr(AudioProcessor, "process_audio_file", fake_process_audio_file)
+    return state
+
+
+def batch(client, files, **params):
+    response = client.post(
+        "/audio/process/batch",
+        files=[("files", (name, content)) for name, content in files],
+        params=params
+    )
+    return response, [json.loads(line) for line in response.text.splitlines()]
+
+
+def zip_bytes(members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, content in members:
+            archive.writestr(name, content)
+    return buffer.getvalue()
+
+
+def test_batch_streams_in_completion_order(client, transcriptions):
+    response, lines = batch(client, [("slow.wav", b"slow:0.3"), ("fast.wav", b"fast:0")])
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert [line["filename"] for line in lines] == ["fast.wav", "slow.wav"]
+    assert [line["index"] for line in lines] == [1, 0]
+    assert all(line["status"] == "success" for line in lines)
+
+
+def test_batch_failure_does_not_fail_other_files(client, transcriptions):
+    _, lines = batch(client, [("a.wav", b"ok:0"), ("b.wav", b"fail:0"), ("c.wav", b"ok:0.05")])
+    by_name = {line["filename"]: line for line in lines}
+    assert by_name["b.wav"]["status"] == "error"
+    assert by_name["b.wav"]["error"] == "recognizer unavailable"
+    assert by_name["a.wav"]["status"] == by_name["c.wav"]["status"] == "success"
+
+
+def test_batch_expands_zip_members(client, transcriptions):
+    archive = zip_bytes([("one.wav", b"ok:0"), ("dir/two.wav", b"ok:0"), ("__MACOSX/._one.wav", b"x")])
+    _, lines = batch(client, [("day.zip", archive), ("single.wav", b"ok:0")])
+    assert sorted((line["index"], line["member"]) for line in lines) == [
+        (0, "dir/two.wav"), (0, "one.wav"), (1, None)
+    ]
+    assert all(line["status"] == "success" for line in lines)
+
+
+def test_batch_reports_corrupt_and_oversized_members(client, transcriptions, monkeypatch):
+    monkeypatch.setattr(config, "AUDIO_BATCH_MAX_MEMBER_BYTES", 500)
+    archive = bytearray(zip_bytes([
+        ("good.wav", b"ok:0"), ("bad.wav", bytes(range(256))), ("big.wav", b"0" * 1000)
+    ]))
+    with zipfile.ZipFile(io.BytesIO(bytes(archive))) as parsed:
+        info = parsed.getinfo("bad.wav")
+    data_start = info.header_offset + 30 + len(info.filename) + len(info.extra)
+    for offset in range(data_start + 5, data_start + 25):
+        archive[offset] ^= 0xFF
+
+    response, lines = batch(client, [("day.zip", bytes(archive))])
+    assert response.status_code == 200
+    by_member = {line["member"]: line for line in lines}
+    assert by_member["good.wav"]["status"] == "success"
+    assert by_member["bad.wav"]["status"] == "error"
+    assert by_member["big.wav"]["status"] == "error"
+    assert all(set(line) >= {"index", "filename", "member", "status"} for line in lines)
+
+
+def test_batch_stops_expanding_past_request_limits(client, transcriptions, monkeypatch):
+    members = [(f"{n}.wav", b"ok:0") for n in range(4)]
+
+    monkeypatch.setattr(config, "AUDIO_BATCH_MAX_TOTAL_BYTES", 10)
+    _, lines = batch(client, [("day.zip", zip_bytes(members)), ("single.wav", b"ok:0")])
+    by_member = {line["member"]: line for line in lines}
+    # Each member is 4 bytes: two fit in the budget, the rest are refused
+    assert [by_member[f"{n}.wav"]["status"] for n in range(4)] == ["success", "success", "error", "error"]
+    assert by_member["2.wav"]["error"] == "Batch expansion limit reached"
+    assert by_member[None]["status"] == "success"
+
+    monkeypatch.setattr(config, "AUDIO_BATCH_MAX_TOTAL_BYTES", 1024)
+    monkeypatch.setattr(config, "AUDIO_BATCH_MAX_MEMBERS", 3)
+    _, lines = batch(client, [("day.zip", zip_bytes(members))])
+    assert sorted(line["status"] for line in lines) == ["error", "success", "success", "success"]
+    assert not any(os.path.exists(path) for path in transcriptions["paths"])
+
+
+def test_batch_parallelism_is_capped(client, transcriptions, monkeypatch):
+    monkeypatch.setattr(config, "AUDIO_BATCH_CONCURRENCY", 2)
+    files = [(f"{n}.wav", b"ok:0.05") for n in range(6)]
+    _, lines = batch(client, files, parallelism=10)
+    assert len(lines) == 6
+    assert transcriptions["peak"] == 2
+
+    response, _ = batch(client, files, parallelism=0)
+    assert response.status_code == 422
+
+
+def test_batch_removes_temp_files(client, transcriptions):
+    archive = zip_bytes([("one.wav", b"ok:0"), ("two.wav", b"fail:0")])
+    batch(client, [("day.zip", archive), ("three.wav", b"ok:0")])
+    assert len(transcriptions["paths"]) == 3
+    assert not any(os.path.exists(path) for path in transcriptions["paths"])
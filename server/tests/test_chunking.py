@@ -0,0 +1,56 @@
+import random
+
+from server.services.speech_recognition.chunking import AdaptiveChunker, ChunkPolicy
+
+
+def test_interactive_grows_when_link_cannot_keep_up():
+    chunker = AdaptiveChunker(ChunkPolicy.interactive(800, 32000, 4000))
+    for _ in range(10):
+        # 4000 frames at 16kHz is 250ms of audio; a 400ms round trip falls behind
+        chunker.record(chunker.next_size(), 0.4, True)
+    assert chunker.next_size() > 4000
+    assert chunker.stats["decisions"][0]["from"] == 4000
+
+
+def test_interactive_shrinks_on_fast_link_with_partials():
+    chunker = AdaptiveChunker(ChunkPolicy.interactive(800, 32000, 4000))
+    for _ in range(20):
+        chunker.record(chunker.next_size(), 0.005, True)
+    assert chunker.next_size() == 800
+
+
+def test_interactive_holds_size_without_partials():
+    chunker = AdaptiveChunker(ChunkPolicy.interactive(800, 32000, 4000))
+    for _ in range(20):
+        chunker.record(chunker.next_size(), 0.005, False)
+    assert chunker.next_size() == 4000
+    assert chunker.stats["adjustments"] == 0
+
+
+def test_file_upload_grows_while_throughput_improves():
+    chunker = AdaptiveChunker(ChunkPolicy.file_upload(800, 32000, 4000))
+    for _ in range(10):
+        # Fixed per-message overhead: bigger chunks mean more frames per second
+        chunker.record(chunker.next_size(), 0.02 + chunker.next_size() / 1e6, True)
+    assert chunker.next_size() == 32000
+    assert chunker.stats["mode"] == "file"
+
+
+def test_file_upload_does_not_collapse_when_compute_bound():
+    rng = random.Random(1)
+    for _ in range(6):
+        chunker = AdaptiveChunker(ChunkPolicy.file_upload(800, 32000, 4000))
+        for _ in range(200):
+            # RTT proportional to frames: throughput is flat apart from noise
+            frames = chunker.next_size()
+            chunker.record(frames, frames / 80000 * rng.uniform(0.85, 1.15), False)
+        assert chunker.next_size() > 800
+
+
+def test_sizes_stay_within_bounds():
+    policy = ChunkPolicy.interactive(800, 8000, 100000)
+    assert policy.initial_size == 8000
+    chunker = AdaptiveChunker(policy)
+    for _ in range(10):
+        chunker.record(chunker.next_size(), 5.0, True)
+    assert chunker.next_size() == 8000
@@ -0,0 +1,194 @@
+import errno
+import threading
+
+import pytest
+
+from server.services.inventory.ledger import (
+    InsufficientStockError,
+    InventoryError,
+    InventoryLedger,
+    UnknownProductError,
+)
+from server.services.inventory.store import SQLiteStockStore
+
+
+def make_ledger(tmp_path, stock, **kwargs):
+    store = SQLiteStockStore(str(tmp_path / "inventory.db"))
+    store.seed(stock)
+    ledger = InventoryLedger(store, str(tmp_path / "inventory.journal"), **kwargs)
+    ledger.start()
+    return ledger
+
+
+def crash(ledger):
+    """Stop a ledger's writers without flushing, as if the process died."""
+    ledger._stopped.set()
+    ledger._wake.set()
+    ledger._flusher.join()
+    ledger._journal.close()
+    ledger.store.close()
+
+
+def test_concurrent_sales_never_oversell(tmp_path):
+    ledger = make_ledger(tmp_path, {1: 500, 2: 300}, flush_batch=50)
+    sold = []
+    sold_lock = threading.Lock()
+
+    def till():
+        for _ in range(100):
+            try:
+                ledger.decrement({1: 1, 2: 1})
+            except InsufficientStockError:
+                continue
+            with sold_lock:
+                sold.append(1)
+
+    tills = [threading.Thread(target=till) for _ in range(8)]
+    for t in tills:
+        t.start()
+    for t in tills:
+        t.join()
+    ledger.stop()
+
+    # Product 2 runs out first; multi-item sales are all-or-nothing
+    assert len(sold) == 300
+    assert ledger.snapshot() == {1: 200, 2: 0}
+    assert ledger.stats["rejected"] == 800 - 300
+    assert ledger.store.load() == ({1: 200, 2: 0}, 300)
+
+
+def test_rejects_oversell_and_unknown_products(tmp_path):
+    ledger = make_ledger(tmp_path, {1: 2})
+    with pytest.raises(InsufficientStockError) as exc:
+        ledger.decrement({1: 3})
+    assert exc.value.available == 2
+    with pytest.raises(UnknownProductError):
+        ledger.decrement({99: 1})
+    assert ledger.get_stock(1) == 2
+    ledger.stop()
+
+
+def test_replays_unflushed_journal_after_crash(tmp_path):
+    ledger = make_ledger(tmp_path, {1: 10}, flush_interval=3600)
+    ledger.decrement({1: 3})
+    ledger.restock({1: 1})
+    crash(ledger)
+
+    recovered = make_ledger(tmp_path, {1: 10})
+    assert recovered.get_stock(1) == 8
+    assert recovered.stats["replayed"] == 2
+    recovered.decrement({1: 1})
+    recovered.stop()
+    assert recovered.store.load() == ({1: 7}, 3)
+
+
+class FailingStore(SQLiteStockStore):
+    def apply(self, deltas, seq):
+        raise OSError("database is locked")
+
+
+def test_failed_flush_keeps_changes_pending(tmp_path):
+    store = FailingStore(str(tmp_path / "inventory.db"))
+    store.seed({1: 10})
+    ledger = InventoryLedger(store, str(tmp_path / "inventory.journal"), flush_interval=3600)
+    ledger.start()
+    ledger.decrement({1: 1})
+    with pytest.raises(OSError):
+        ledger.flush()
+    ledger.decrement({1: 2})
+    assert ledger.stats["pending_entries"] == 2
+    with pytest.raises(OSError):
+        ledger.flush()
+    assert ledger.stats["pending_entries"] == 2
+    crash(ledger)
+
+    recovered = make_ledger(tmp_path, {1: 10})
+    assert recovered.get_stock(1) == 7
+    recovered.stop()
+
+
+def test_recovery_skips_entries_duplicated_by_interrupted_merge(tmp_path):
+    ledger = make_ledger(tmp_path, {1: 10}, flush_interval=3600)
+    ledger.decrement({1: 1})
+    ledger.decrement({1: 2})
+    crash(ledger)
+    # Crash after the merge into .flushing but before the live journal was removed
+    journal = tmp_path / "inventory.journal"
+    (tmp_path / "inventory.journal.flushing").write_text(journal.read_text())
+
+    recovered = make_ledger(tmp_path, {1: 10})
+    assert recovered.get_stock(1) == 7
+    assert recovered.stats["replayed"] == 2
+    recovered.stop()
+
+
+def test_recovery_refuses_corrupt_entry_before_acknowledged_ones(tmp_path):
+    ledger = make_ledger(tmp_path, {1: 10}, flush_interval=3600)
+    ledger.decrement({1: 1})
+    crash(ledger)
+    journal = tmp_path / "inventory.journal"
+    good = journal.read_text()
+    journal.write_text('{"seq": 2, "del\n' + good.replace('"seq": 1', '"seq": 3'))
+
+    store = SQLiteStockStore(str(tmp_path / "inventory.db"))
+    ledger = InventoryLedger(store, str(journal))
+    with pytest.raises(InventoryError):
+        ledger.start()
+    assert journal.exists()
+    store.close()
+
+
+def test_recovery_ignores_torn_final_entry(tmp_path):
+    ledger = make_ledger(tmp_path, {1: 10}, flush_interval=3600)
+    ledger.decrement({1: 1})
+    crash(ledger)
+    with open(tmp_path / "inventory.journal", "a") as journal:
+        journal.write('{"seq": 2, "del')
+
+    recovered = make_ledger(tmp_path, {1: 10})
+    assert recovered.get_stock(1) == 9
+    recovered.stop()
+
+
+class PartialWriteJournal:
+    """Journal file that writes a few bytes of the next entry, then fails."""
+
+    def __init__(self, journal):
+        self.journal = journal
+
+    def write(self, data):
+        self.journal.write(data[:10])
+        raise OSError(errno.ENOSPC, "No space left on device")
+
+    def __getattr__(self, name):
+        return getattr(self.journal, name)
+
+
+def test_failed_append_leaves_no_partial_entry(tmp_path):
+    ledger = make_ledger(tmp_path, {1: 10}, flush_interval=3600)
+    ledger.decrement({1: 1})
+    journal = ledger._journal
+    ledger._journal = PartialWriteJournal(journal)
+    with pytest.raises(OSError):
+        ledger.decrement({1: 2})
+    ledger._journal = journal
+    assert ledger.get_stock(1) == 9
+    ledger.decrement({1: 3})
+    crash(ledger)
+
+    recovered = make_ledger(tmp_path, {1: 10})
+    assert recovered.get_stock(1) == 6
+    recovered.stop()
+
+
+def test_stop_closes_journal_when_final_flush_fails(tmp_path):
+    store = FailingStore(str(tmp_path / "inventory.db"))
+    store.seed({1: 10})
+    ledger = InventoryLedger(store, str(tmp_path / "inventory.journal"), flush_interval=3600)
+    ledger.start()
+    ledger.decrement({1: 1})
+    journal = ledger._journal
+    with pytest.raises(OSError):
+        ledger.stop()
+    assert journal.closed
+    store.close()